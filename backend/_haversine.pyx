@@ -0,0 +1,28 @@
+# cython: boundscheck=False, wraparound=False, cdivision=True
+"""
+OpenMP-parallel pairwise haversine kernel.
+
+Fallback for deploy targets where Numba is unavailable (ARM, musl, Power).
+Build in place with:
+
+    python setup.py build_ext --inplace
+"""
+from libc.math cimport sin, cos, asin, sqrt
+from cython.parallel cimport prange
+
+cdef double _EARTH_RADIUS_KM = 6371.0
+
+
+def pairwise(double[::1] lat, double[::1] lng, double[:, ::1] out):
+    """Fill out[i, j] with haversine distances (km); inputs in radians."""
+    cdef Py_ssize_t n = lat.shape[0]
+    cdef Py_ssize_t i, j
+    cdef double dlat, dlng, a, d
+    for i in prange(n, nogil=True, schedule='static'):
+        for j in range(i + 1, n):
+            dlat = lat[j] - lat[i]
+            dlng = lng[j] - lng[i]
+            a = sin(dlat / 2) ** 2 + cos(lat[i]) * cos(lat[j]) * sin(dlng / 2) ** 2
+            d = 2.0 * _EARTH_RADIUS_KM * asin(sqrt(a))
+            out[i, j] = d
+            out[j, i] = d
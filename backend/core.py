@@ -1,21 +1,38 @@
+import asyncio
+import base64
+import itertools
 import math
+from dataclasses import dataclass
+
 import numpy as np
 import networkx as nx
-from typing import Dict, Any, List, Tuple
+from scipy.sparse.csgraph import csgraph_from_dense, dijkstra as csgraph_dijkstra
+from typing import Dict, Any, List, Optional, Tuple
 from db import get_db
 
-from qiskit_aer import Aer
-from qiskit_algorithms import QAOA   # ✅ comes from qiskit-algorithms
+from qiskit import transpile
+from qiskit_aer import AerSimulator
+from qiskit_aer.primitives import Sampler as AerSampler
+from qiskit.circuit.library import QAOAAnsatz
 from qiskit_algorithms.optimizers import COBYLA
 from qiskit_optimization import QuadraticProgram
-from qiskit_optimization.algorithms import MinimumEigenOptimizer
-from qiskit.primitives import Sampler
+from qiskit_optimization.converters import QuadraticProgramToQubo
 
-from qiskit_optimization.applications import Tsp 
+from qiskit_optimization.applications import Tsp
 
+# The pairwise haversine kernel has three implementations, best first:
+# a Numba JIT, the Cython/OpenMP extension (see _haversine.pyx, for targets
+# where Numba won't install), and the NumPy broadcast fallback.
+try:
+    from numba import njit, prange
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
 
-# instead of algorithm_globals
-np.random.seed(42)
+try:
+    import _haversine as _haversine_ext
+except ImportError:
+    _haversine_ext = None
 
 # -------------------------
 # Utilities
@@ -27,154 +44,603 @@ def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
     dlat = lat2 - lat1
     dlng = lng2 - lng1
     a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlng/2)**2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    return R * c
+    # asin(sqrt(a)) is equivalent to atan2(sqrt(a), sqrt(1-a)) for a <= 1
+    # but needs one sqrt instead of two plus the atan2 dispatch.
+    return 2 * R * math.asin(math.sqrt(a))
+
+
+if _HAS_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _pairwise_haversine_rad(lat: np.ndarray, lng: np.ndarray, out: np.ndarray) -> None:
+        """Fill out[i, j] with haversine distances (km); inputs in radians."""
+        n = lat.shape[0]
+        for i in prange(n):
+            for j in range(i + 1, n):
+                dlat = lat[j] - lat[i]
+                dlng = lng[j] - lng[i]
+                a = math.sin(dlat / 2) ** 2 + math.cos(lat[i]) * math.cos(lat[j]) * math.sin(dlng / 2) ** 2
+                d = 2.0 * 6371.0 * math.asin(math.sqrt(a))
+                out[i, j] = d
+                out[j, i] = d
+
+    # Trigger the JIT at import with a tiny dummy input so the first real
+    # request doesn't pay compile time (cache=True persists the artifact).
+    _pairwise_haversine_rad(np.zeros(2), np.zeros(2), np.zeros((2, 2)))
+
+
+def pairwise_haversine_rad(lat: np.ndarray, lng: np.ndarray, cos_lat: np.ndarray) -> np.ndarray:
+    """
+    Compute the full NxN haversine distance matrix (km) from radian
+    coordinate buffers with cos(lat) already precomputed.
+
+    Uses a Numba-compiled parallel kernel when available (no NxN temporary
+    arrays, one fused loop per thread), then the Cython/OpenMP extension,
+    and finally falls back to NumPy broadcasting.
+    """
+    if _HAS_NUMBA:
+        out = np.zeros((lat.shape[0], lat.shape[0]), dtype=np.float64)
+        _pairwise_haversine_rad(lat, lng, out)
+        return out
+    if _haversine_ext is not None:
+        out = np.zeros((lat.shape[0], lat.shape[0]), dtype=np.float64)
+        _haversine_ext.pairwise(np.ascontiguousarray(lat), np.ascontiguousarray(lng), out)
+        return out
+    dlat = lat[:, None] - lat[None, :]
+    dlng = lng[:, None] - lng[None, :]
+    a = np.sin(dlat / 2) ** 2 + cos_lat[:, None] * cos_lat[None, :] * np.sin(dlng / 2) ** 2
+    return 2 * 6371.0 * np.arcsin(np.sqrt(a))
+
+
+def pairwise_haversine_km(lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Degree-input convenience wrapper around pairwise_haversine_rad."""
+    lat = np.radians(np.asarray(lats, dtype=np.float64))
+    lng = np.radians(np.asarray(lngs, dtype=np.float64))
+    return pairwise_haversine_rad(lat, lng, np.cos(lat))
 
 
 # -------------------------
-# Graph build helpers
+# Distance-matrix cache
 # -------------------------
-async def build_graph_from_nodes(node_ids: List[str]) -> nx.Graph:
+# Nodes change rarely compared to how often routes are requested, so the
+# fetched node documents and the pairwise distance matrix are cached across
+# requests, keyed by the sorted node-id set. The node-mutating routes call
+# bump_nodes_version() to invalidate.
+_matrix_cache: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+
+# Incremented on every node mutation; entries computed on executor threads
+# are only stored if the version they started from is still current.
+_nodes_version = 0
+
+
+def bump_nodes_version() -> None:
+    """Invalidate all per-node-set caches after a node insert/delete."""
+    global _nodes_version
+    _nodes_version += 1
+    _matrix_cache.clear()
+    optimizer._route_cache.clear()
+
+
+def _nodes_to_soa(nodes: List[Dict[str, Any]]) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
     """
-    Load a specific list of nodes from DB and construct a weighted complete graph.
+    Reshape a list of node documents (AoS) into an id list plus contiguous
+    radian lat/lng buffers and precomputed cos(lat) (SoA), so the numeric
+    kernels index plain float64 arrays and the degrees->radians and cos()
+    work happens once per node load, not per distance call.
     """
-    print(f"\n--- Building graph for {len(node_ids)} selected nodes ---")
+    n = len(nodes)
+    ids = [node['id'] for node in nodes]
+    lat_rad = np.radians(np.fromiter((node['lat'] for node in nodes), dtype=np.float64, count=n))
+    lng_rad = np.radians(np.fromiter((node['lng'] for node in nodes), dtype=np.float64, count=n))
+    return ids, lat_rad, lng_rad, np.cos(lat_rad)
+
+
+def _entry_from_docs(nodes: List[Dict[str, Any]], version: int) -> Dict[str, Any]:
+    """Build a cache entry {"nodes", "ids", "idx", "D"} from node documents.
+
+    `version` is the _nodes_version the caller observed *before* fetching
+    the documents from Mongo; a mutation landing any time after that fetch
+    started makes the docs stale, so the entry is returned but not cached.
+    """
+    ids, lat_rad, lng_rad, cos_lat = _nodes_to_soa(nodes)
+    entry = {
+        "nodes": nodes,
+        "ids": ids,
+        "idx": {node_id: i for i, node_id in enumerate(ids)},
+        "D": pairwise_haversine_rad(lat_rad, lng_rad, cos_lat),
+    }
+    # This may run on an executor thread; if a mutation invalidated the
+    # cache any time after the docs were fetched, storing now would
+    # resurrect the stale node set.
+    if version == _nodes_version:
+        _matrix_cache[tuple(sorted(ids))] = entry
+    return entry
+
+
+async def _load_matrix_entry(node_ids: List[str]) -> Dict[str, Any]:
+    """
+    Return {"nodes", "ids", "idx", "D"} for the given node ids, reusing the
+    cache (or slicing a cached superset matrix) when possible.
+    """
+    key = tuple(sorted(node_ids))
+    entry = _matrix_cache.get(key)
+    if entry is not None:
+        return entry
+
+    # A cached superset (e.g. the full node set from the visualization
+    # endpoint) can serve any subset by slicing rows/columns. Snapshot the
+    # values: executor threads insert into the dict concurrently.
+    requested = set(node_ids)
+    for sup in list(_matrix_cache.values()):
+        if requested <= set(sup["ids"]):
+            sel = [sup["idx"][i] for i in key]
+            entry = {
+                "nodes": [sup["nodes"][i] for i in sel],
+                "ids": list(key),
+                "idx": {node_id: i for i, node_id in enumerate(key)},
+                "D": sup["D"][np.ix_(sel, sel)],
+            }
+            _matrix_cache[key] = entry
+            return entry
+
+    # Observe the version before the fetch: a mutation that lands while the
+    # find() is in flight (or before the executor task starts) must keep the
+    # resulting entry out of the cache.
+    version = _nodes_version
     db = await get_db()
-    
-    # Query MongoDB to find all documents where the 'id' is in our list
     query = {"id": {"$in": node_ids}}
-    nodes_cursor = db.nodes.find(query)
-    nodes = await nodes_cursor.to_list(len(node_ids))
+    # Project just the fields the graph needs; timestamp etc. are discarded.
+    projection = {"_id": 0, "id": 1, "name": 1, "lat": 1, "lng": 1}
+    nodes = await db.nodes.find(query, projection).to_list(len(node_ids))
+    # The O(N^2) matrix build is sync CPU work; keep it off the event loop.
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, _entry_from_docs, nodes, version)
 
-    print(f"1. Fetched {len(nodes)} matching nodes from MongoDB.")
 
-    G = nx.Graph()
-    for node in nodes:
-        G.add_node(node['id'], name=node['name'], lat=node['lat'], lng=node['lng'])
+# -------------------------
+# Graph build helpers
+# -------------------------
+@dataclass
+class GraphData:
+    """
+    Lightweight complete-graph container: node ids, an id -> index map, the
+    contiguous distance matrix and the raw node documents. Avoids networkx's
+    dict-of-dicts edge storage (~200 bytes/edge) on the solver hot path.
+    """
+    node_ids: List[str]
+    idx: Dict[str, int]
+    W: np.ndarray
+    nodes: List[Dict[str, Any]]
+
+    def to_networkx(self) -> nx.Graph:
+        """Materialize a networkx graph (only needed for visualization/debug)."""
+        G = nx.Graph()
+        for node in self.nodes:
+            G.add_node(node['id'], name=node['name'], lat=node['lat'], lng=node['lng'])
+        iu = np.triu_indices(len(self.node_ids), k=1)
+        G.add_weighted_edges_from(
+            (self.node_ids[i], self.node_ids[j], self.W[i, j])
+            for i, j in zip(iu[0], iu[1])
+        )
+        return G
+
+
+async def build_graph_from_nodes(node_ids: List[str]) -> GraphData:
+    """
+    Load a specific list of nodes from DB and construct the complete-graph
+    distance data for them.
+    """
+    print(f"\n--- Building graph for {len(node_ids)} selected nodes ---")
+    entry = await _load_matrix_entry(node_ids)
 
-    print(f"2. Added {G.number_of_nodes()} nodes to the graph object.")
+    print(f"1. Loaded {len(entry['nodes'])} matching nodes (cache size: {len(_matrix_cache)}).")
 
-    # This part remains the same, building a complete graph from the nodes we found
-    print("3. Creating edges...")
-    node_list = list(G.nodes(data=True))
-    for i, (n1, d1) in enumerate(node_list):
-        for j, (n2, d2) in enumerate(node_list):
-            if i < j:
-                dist = haversine_km(d1['lat'], d1['lng'], d2['lat'], d2['lng'])
-                G.add_edge(n1, n2, weight=dist)
+    graph = GraphData(
+        node_ids=list(entry["ids"]),
+        idx=dict(entry["idx"]),
+        W=entry["D"],
+        nodes=entry["nodes"],
+    )
 
     print("--- Graph Ready ---\n")
-    return G
+    return graph
 
 
-async def graph_visualization() -> Dict[str, List[Dict[str, Any]]]:
-    """Prepare graph nodes and edges for frontend visualization."""
+async def graph_visualization(
+    max_edges: Optional[int] = None,
+    min_weight: Optional[float] = None,
+    fmt: str = "edges",
+) -> Dict[str, Any]:
+    """
+    Prepare graph nodes and edges for frontend visualization.
+
+    The complete graph has N(N-1)/2 edges, which gets heavy to serialize and
+    ship as N grows; `max_edges` keeps only the K shortest edges and
+    `min_weight` drops edges below the given distance (km). With
+    fmt="matrix" the edge list is replaced by the whole distance matrix as a
+    base64 float32 blob (4 bytes per pair vs ~60 bytes of edge JSON) plus the
+    row/column id order, and the client derives whatever edges it needs.
+    """
+    version = _nodes_version  # observed before the fetch, see _load_matrix_entry
     db = await get_db()
-    nodes = await db.nodes.find().to_list(1000)
+    projection = {"_id": 0, "id": 1, "name": 1, "lat": 1, "lng": 1}
+    nodes = await db.nodes.find({}, projection).to_list(length=None)
+
+    # Share the distance work (and the cache) with build_graph_from_nodes
+    # instead of repeating the O(N^2) haversine loop here.
+    key = tuple(sorted(n['id'] for n in nodes))
+    entry = _matrix_cache.get(key)
+    if entry is None:
+        loop = asyncio.get_running_loop()
+        entry = await loop.run_in_executor(None, _entry_from_docs, nodes, version)
+    ids, D = entry["ids"], entry["D"]
 
     vis_nodes = [
         {"id": n['id'], "name": n['name'], "lat": n['lat'], "lng": n['lng']} for n in nodes
     ]
 
-    vis_edges = []
-    for i, n1 in enumerate(vis_nodes):
-        for j, n2 in enumerate(vis_nodes):
-            if i < j:
-                d = haversine_km(n1['lat'], n1['lng'], n2['lat'], n2['lng'])
-                vis_edges.append({"from": n1['id'], "to": n2['id'], "weight": round(d, 2)})
+    if fmt == "matrix":
+        blob = base64.b64encode(D.astype(np.float32).tobytes()).decode()
+        return {"nodes": vis_nodes, "ids": list(ids), "distance_matrix_b64": blob}
+
+    iu = np.triu_indices(len(ids), k=1)
+    weights = D[iu]
+    sel = np.arange(len(weights))
+    if min_weight is not None:
+        sel = sel[weights[sel] >= min_weight]
+    if max_edges is not None and len(sel) > max_edges:
+        # argpartition picks the K shortest edges without a full sort.
+        shortest = np.argpartition(weights[sel], max_edges)[:max_edges]
+        sel = sel[shortest]
+
+    vis_edges = [
+        {"from": ids[i], "to": ids[j], "weight": round(float(D[i, j]), 2)}
+        for i, j in zip(iu[0][sel], iu[1][sel])
+    ]
 
     return {"nodes": vis_nodes, "edges": vis_edges}
 
 # -------------------------
 # Algorithms
 # -------------------------
+# Basis states up to this qubit count get their QUBO cost precomputed as one
+# table (2^16 entries = 0.5 MB); beyond that, costs are evaluated per sampled
+# key in chunks.
+_MAX_COST_TABLE_QUBITS = 16
+
+# Tours over at most this many nodes are solved by exact enumeration instead
+# of QAOA: a handful of (n-1)! tours is tiny next to the 2^(n^2) QUBO space
+# the circuit sweeps, and the answer is exact. Kept low enough that the QAOA
+# path is actually reachable from the API (see QAOA_MAX_STOPS).
+_BRUTE_FORCE_MAX_NODES = 4
+
+# Endpoint-facing cap for 'qaoa' requests. The TSP encoding uses n^2 qubits
+# and the transpile target tops out at 63, so 7 stops (49 qubits) is the
+# largest tour the circuit path can take; the endpoint rejects anything
+# above it up front rather than failing mid-solve.
+QAOA_MAX_STOPS = 7
+
+# Hard cap on the number of candidate paths the quantum-inspired sampler
+# enumerates. On a complete graph the simple-path count explodes
+# factorially; Yen's algorithm yields paths shortest-first, so the tail we
+# never generate is also the tail we would almost never sample.
+_MAX_SAMPLED_PATHS = 20
+
+
+def _qubo_costs(keys: np.ndarray, Q: np.ndarray, c: np.ndarray, const: float) -> np.ndarray:
+    """
+    Evaluate the QUBO objective x^T Q x + c^T x + const for basis-state keys
+    (little-endian integers, qubit i = bit i), vectorized and chunked so large
+    key batches don't blow up memory.
+    """
+    n = Q.shape[0]
+    bits = np.arange(n, dtype=np.int64)
+    out = np.empty(len(keys), dtype=np.float64)
+    for lo in range(0, len(keys), 1 << 20):
+        chunk = keys[lo:lo + (1 << 20)]
+        X = ((chunk[:, None] >> bits) & 1).astype(np.float64)
+        out[lo:lo + (1 << 20)] = np.einsum('bi,ij,bj->b', X, Q, X) + X @ c + const
+    return out
+
+
 class QuantumRouteOptimizer:
     """
     Solves routing problems using classical and quantum algorithms.
     Includes Dijkstra for A-to-B paths and QAOA for the Traveling Salesperson Problem (TSP).
     """
 
-    def solve_tsp_qaoa(self, graph: nx.Graph, p: int = 1) -> Tuple[List[str], float]:
+    def __init__(self):
+        # Dedicated PCG64 generator: reproducible like the old global
+        # np.random.seed(42), but lock-free and safe to use from the
+        # request handlers without touching shared legacy RandomState.
+        self._rng = np.random.default_rng(42)
+        # Memoized (stops, algorithm) -> (path, distance); cleared by
+        # bump_nodes_version() whenever the node set changes.
+        self._route_cache: Dict[Tuple[Tuple[str, ...], str], Tuple[List[str], float]] = {}
+
+    def solve_tsp_qaoa(self, graph: GraphData, p: int = 1) -> Tuple[List[str], float]:
         """
         Solves the Traveling Salesperson Problem (TSP) using QAOA.
         Finds the optimal tour that visits every node in the graph.
         """
         # Pre-check: TSP needs at least 2 nodes to be meaningful.
-        if graph.number_of_nodes() < 2:
+        if len(graph.node_ids) < 2:
             return [], 0.0
-            
+
         try:
-            # 1. IMPORTANT: Relabel the graph nodes to integers (0, 1, 2...)
-            # The Tsp class requires an integer-labeled graph.
-            # We store the `mapping` to convert the result back later.
-            int_graph = nx.convert_node_labels_to_integers(graph, label_attribute='original_label')
-            
-            # Create an inverse mapping to get original IDs from integer labels
-            inverse_mapping = nx.get_node_attributes(int_graph, 'original_label')
-
-            # 2. Create a TSP instance from the integer-labeled graph
+            # 1. The Tsp class requires an integer-labeled graph; build it
+            # straight from the distance matrix. Row/column i corresponds to
+            # graph.node_ids[i], which gives us the mapping back.
+            int_graph = nx.from_numpy_array(graph.W)
+
+            # 2. Create a TSP instance and convert it to a QUBO once.
             tsp = Tsp(int_graph)
             qp = tsp.to_quadratic_program()
+            qubo = QuadraticProgramToQubo().convert(qp)
+            n = qubo.get_num_binary_vars()
+
+            # 3. Precompute the diagonal cost of the QUBO once, so each COBYLA
+            # iteration only has to do a probability-weighted dot product over
+            # the sampled basis states instead of re-applying the cost
+            # Hamiltonian.
+            Q = qubo.objective.quadratic.to_array(symmetric=True)
+            c = qubo.objective.linear.to_array()
+            const = qubo.objective.constant
+            if n <= _MAX_COST_TABLE_QUBITS:
+                cost_table = _qubo_costs(np.arange(1 << n, dtype=np.int64), Q, c, const)
+                cost_of = lambda keys: cost_table[keys]
+            else:
+                cost_of = lambda keys: _qubo_costs(keys, Q, c, const)
+
+            # 4. Build the QAOA ansatz from the Ising operator and minimize
+            # the sampled energy with COBYLA.
+            op, _ = qubo.to_ising()
+            ansatz = QAOAAnsatz(cost_operator=op, reps=p)
+            ansatz.measure_all()
+            # The matrix-product-state method handles low-entanglement QAOA
+            # circuits in far less memory than a full 2^n statevector, which
+            # is what allows more stops per tour.
+            backend_options = {
+                "method": "matrix_product_state",
+                "matrix_product_state_max_bond_dimension": 64,
+                "matrix_product_state_truncation_threshold": 1e-8,
+            }
+            # Only the angles change between COBYLA iterations, so transpile
+            # the parameterized ansatz exactly once and tell the samplers to
+            # skip their own per-circuit transpilation.
+            ansatz = transpile(
+                ansatz, AerSimulator(**backend_options), optimization_level=3
+            )
+            # Moderate shots are enough to estimate the energy inside the
+            # optimizer loop; the final solution extraction below samples much
+            # harder, since feasible tours are a tiny fraction of basis states.
+            sampler = AerSampler(
+                backend_options=backend_options,
+                run_options={"shots": 1024, "seed": 42},
+                skip_transpilation=True,
+            )
+            final_sampler = AerSampler(
+                backend_options=backend_options,
+                run_options={"shots": 32768, "seed": 42},
+                skip_transpilation=True,
+            )
+
+            def _sample(theta, use_final=False):
+                active = final_sampler if use_final else sampler
+                quasi = active.run(ansatz, theta).result().quasi_dists[0]
+                keys = np.fromiter(quasi.keys(), dtype=np.int64, count=len(quasi))
+                probs = np.fromiter(quasi.values(), dtype=np.float64, count=len(quasi))
+                return keys, probs
+
+            def _energy(theta):
+                keys, probs = _sample(theta)
+                return float(probs @ cost_of(keys))
+
+            initial = np.full(ansatz.num_parameters, 0.1)
+            opt_result = COBYLA(maxiter=100).minimize(_energy, x0=initial)
+
+            # 5. Sample at the optimized angles and take the best feasible
+            # bitstring (penalty terms push infeasible states to high cost,
+            # so the cheapest sampled states are checked first).
+            keys, _ = _sample(opt_result.x, use_final=True)
+            order = np.argsort(cost_of(keys))
+            bits = np.arange(n, dtype=np.int64)
+            for k in keys[order]:
+                x = ((int(k) >> bits) & 1).astype(np.float64)
+                feasible, _, _ = qp.get_feasibility_info(x)
+                if feasible:
+                    break
+            else:
+                return [], float("inf")
+
+            # 6. Interpret the bitstring (path will be a list of integers)
+            path = tsp.interpret(x)
+
+            distance = Tsp.tsp_value(path, graph.W)
+
+            # 7. Convert the integer path back to original node IDs
+            path_ids = [graph.node_ids[i] for i in path]
 
-            # 3. Set up and run the QAOA solver
-            sampler = Sampler(options={"seed": 42})
-            qaoa = QAOA(sampler=sampler, optimizer=COBYLA(maxiter=100), reps=p)
-            optimizer = MinimumEigenOptimizer(qaoa)
-            result = optimizer.solve(qp)
-
-            # 4. Interpret the result (path will be a list of integers)
-            path = tsp.interpret(result)
-
-            adj_matrix = nx.to_numpy_array(int_graph)
-        
-            distance = Tsp.tsp_value(path, adj_matrix)
-            
-            # 5. Use the INVERSE mapping to convert the integer path back to original node IDs
-            path_ids = [inverse_mapping[i] for i in path]
-            
             # To make it a round trip, add the starting node to the end
             path_ids.append(path_ids[0])
-            
+
             return path_ids, distance
 
         except Exception as e:
             print(f"QAOA TSP Error: {e}")
             return [], float("inf")
 
-    def solve_dijkstra(self, graph: nx.Graph, start: str, end: str) -> Tuple[List[str], float]:
-        """Classical shortest path via Dijkstra."""
+    def solve_tsp_brute_force(self, graph: GraphData) -> Tuple[List[str], float]:
+        """
+        Exact TSP for small instances: enumerate every tour over the distance
+        matrix (first node fixed, (n-1)! permutations) and keep the minimum.
+        """
+        n = len(graph.node_ids)
+        if n < 2:
+            return [], 0.0
+
+        # Evaluate all (n-1)! tours in one vectorized gather over the distance
+        # matrix instead of a Python loop per permutation (40320 x 8 at n=8).
+        W = graph.W
+        perms = np.array(list(itertools.permutations(range(1, n))), dtype=np.int64)
+        tours = np.hstack([np.zeros((len(perms), 1), dtype=np.int64), perms])
+        tour_dists = W[tours[:, :-1], tours[:, 1:]].sum(axis=1) + W[tours[:, -1], 0]
+        best = int(tour_dists.argmin())
+        best_tour, best_dist = tours[best], tour_dists[best]
+
+        path_ids = [graph.node_ids[i] for i in best_tour]
+        path_ids.append(path_ids[0])
+        return path_ids, float(best_dist)
+
+    def solve_qaoa_inspired(
+        self, graph: GraphData, start: str, end: str, k: int = _MAX_SAMPLED_PATHS
+    ) -> Tuple[List[str], float]:
+        """
+        Quantum-inspired A-to-B router: enumerate only the k shortest simple
+        paths (Yen's algorithm, yielded in increasing weight) and sample one
+        with probability biased towards shorter paths, mimicking QAOA's
+        amplitude concentration without simulating a circuit. Enumerating all
+        simple paths would be combinatorially explosive on a complete graph.
+        """
+        G = graph.to_networkx()
         try:
-            path = nx.shortest_path(graph, source=start, target=end, weight="weight")
-            dist = nx.shortest_path_length(graph, source=start, target=end, weight="weight")
-            return path, dist
-        except nx.NetworkXNoPath:
+            paths = list(
+                itertools.islice(nx.shortest_simple_paths(G, start, end, weight="weight"), k)
+            )
+        except (nx.NetworkXNoPath, nx.NodeNotFound):
+            return [], float("inf")
+
+        # Sum each path's edge weights straight off the distance matrix: one
+        # fancy-index per path instead of two dict lookups per edge.
+        path_data = []
+        for path in paths:
+            ix = np.fromiter((graph.idx[n] for n in path), dtype=np.int32, count=len(path))
+            dist = float(graph.W[ix[:-1], ix[1:]].sum())
+            path_data.append((path, dist))
+
+        dists = np.fromiter((pd[1] for pd in path_data), dtype=np.float64, count=len(path_data))
+        span = dists.max() - dists.min()
+        if span == 0:
+            weights = np.ones(len(dists))
+        else:
+            weights = np.exp(-2.0 * (dists - dists.min()) / span)
+
+        # Inverse-CDF draw: rng.choice(p=...) re-validates and normalizes the
+        # probability vector on every call, which is pure overhead for a
+        # handful of paths.
+        cdf = np.cumsum(weights)
+        choice = int(np.searchsorted(cdf, self._rng.random() * cdf[-1]))
+        path, dist = path_data[choice]
+        return path, float(dist)
+
+    def _dijkstra_row(self, graph: GraphData, start: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Single-source Dijkstra: distances and predecessors to every node."""
+        # Passing the dense matrix directly would make csgraph treat zero
+        # entries as missing edges, dropping the real 0-km edges between
+        # coincident nodes; converting with null_value=inf keeps them.
+        W = csgraph_from_dense(graph.W, null_value=np.inf)
+        return csgraph_dijkstra(
+            W, indices=graph.idx[start], return_predecessors=True
+        )
+
+    @staticmethod
+    def _walk_predecessors(graph: GraphData, predecessors: np.ndarray, s: int, t: int) -> List[str]:
+        """Walk the predecessor array backwards from the target."""
+        path_idx = [t]
+        while path_idx[-1] != s:
+            path_idx.append(predecessors[path_idx[-1]])
+        path_idx.reverse()
+        return [graph.node_ids[i] for i in path_idx]
+
+    def solve_dijkstra(self, graph: GraphData, start: str, end: str) -> Tuple[List[str], float]:
+        """Classical shortest path via Dijkstra (SciPy's C implementation)."""
+        s, t = graph.idx[start], graph.idx[end]
+        dist_row, predecessors = self._dijkstra_row(graph, start)
+        if np.isinf(dist_row[t]):
             return [], float("inf")
+        return self._walk_predecessors(graph, predecessors, s, t), float(dist_row[t])
 
-    def solve_multi_stop(self, graph: nx.Graph, stops: List[str], algorithm: str) -> Tuple[List[str], float]:
+    def solve_multi_stop(self, graph: GraphData, stops: List[str], algorithm: str) -> Tuple[List[str], float]:
         """
         Computes a route across multiple stops.
         - 'dijkstra': Solves in the given order [A->B, B->C, ...].
+        - 'quantum-inspired': Same ordering, but each leg samples among the k shortest paths.
         - 'qaoa-tsp': Solves the TSP to find the optimal order of all nodes in the graph.
         """
         algorithm = algorithm.lower()
 
+        # Deterministic algorithms are memoized per (stops, algorithm) until
+        # the node set changes; the quantum-inspired sampler stays random.
+        cache_key = (tuple(stops), algorithm)
+        if algorithm != "quantum-inspired":
+            cached = self._route_cache.get(cache_key)
+            if cached is not None:
+                path, dist = cached
+                return list(path), dist
+
+        path, dist = self._solve_multi_stop(graph, stops, algorithm)
+        if algorithm != "quantum-inspired" and path:
+            self._route_cache[cache_key] = (list(path), dist)
+        return path, dist
+
+    def _solve_multi_stop(self, graph: GraphData, stops: List[str], algorithm: str) -> Tuple[List[str], float]:
         if algorithm == "qaoa":
             # The 'stops' list is ignored for TSP, as it solves for all nodes in the graph.
-            return self.solve_tsp_qaoa(graph)
+            # Small instances are solved exactly; there is nothing for the
+            # quantum circuit to add below _BRUTE_FORCE_MAX_NODES.
+            if len(graph.node_ids) <= _BRUTE_FORCE_MAX_NODES:
+                return self.solve_tsp_brute_force(graph)
+            path, dist = self.solve_tsp_qaoa(graph)
+            if not path and len(graph.node_ids) <= QAOA_MAX_STOPS:
+                # The simulator can refuse a circuit the host cannot fit
+                # (Aer's MPS memory gate); enumeration is still cheap at
+                # these sizes, so fall back to the exact answer instead of
+                # reporting "no path".
+                return self.solve_tsp_brute_force(graph)
+            return path, dist
 
         elif algorithm == "dijkstra":
             if len(stops) < 2:
                 return [], 0.0
-            
+
             full_path: List[str] = []
             total_distance: float = 0.0
 
+            # One single-source run already yields shortest paths to every
+            # target, so cache rows per unique source instead of running a
+            # fresh Dijkstra per consecutive pair; bail out on the first
+            # unreachable segment.
+            rows: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+            for i in range(len(stops) - 1):
+                s, t = stops[i], stops[i+1]
+                if s not in rows:
+                    rows[s] = self._dijkstra_row(graph, s)
+                dist_row, predecessors = rows[s]
+                t_idx = graph.idx[t]
+                if np.isinf(dist_row[t_idx]):
+                    return [], float("inf")
+
+                path = self._walk_predecessors(graph, predecessors, graph.idx[s], t_idx)
+                if full_path:
+                    full_path.extend(path[1:])
+                else:
+                    full_path.extend(path)
+                total_distance += float(dist_row[t_idx])
+
+            return full_path, total_distance
+
+        elif algorithm == "quantum-inspired":
+            if len(stops) < 2:
+                return [], 0.0
+
+            full_path = []
+            total_distance = 0.0
+
             for i in range(len(stops) - 1):
                 s, t = stops[i], stops[i+1]
-                path, dist = self.solve_dijkstra(graph, s, t)
+                path, dist = self.solve_qaoa_inspired(graph, s, t)
                 if not path:
                     return [], float("inf")
-                
+
                 if full_path:
                     full_path.extend(path[1:])
                 else:
@@ -182,7 +648,7 @@ class QuantumRouteOptimizer:
                 total_distance += dist
 
             return full_path, total_distance
-            
+
         else:
             raise ValueError("Invalid algorithm specified.")
 
@@ -15,8 +15,22 @@ _db = None
 async def init_client():
     global _client, _db
     if _client is None:
-        _client = AsyncIOMotorClient(_MONGO_URL)
+        # Motor backs async calls with a threadpool; the default pool of 100
+        # connections is fine but the lazy minimum means cold bursts pay the
+        # connection-handshake cost. Pre-warm a few and fail fast when Mongo
+        # is unreachable instead of hanging for the 30s default.
+        _client = AsyncIOMotorClient(
+            _MONGO_URL,
+            maxPoolSize=100,
+            minPoolSize=10,
+            serverSelectionTimeoutMS=2000,
+        )
         _db = _client[_MONGO_DB]
+        # Queries and deletes look nodes up by the application-level 'id'
+        # field; without this index every lookup is a collection scan.
+        await _db.nodes.create_index("id", unique=True)
+        # The results history is read newest-first and only ever grows.
+        await _db.route_results.create_index([("timestamp", -1)])
 
 async def get_db():
     if _db is None:
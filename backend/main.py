@@ -1,17 +1,32 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 
 from db import init_client, close_client
 from routes import router as api_router
 
+# libuv-backed event loop; a drop-in 2-4x throughput win for the I/O-bound
+# endpoints. Optional because uvloop does not build on Windows.
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_client()
     yield
     await close_client()
 
-app = FastAPI(title="Quantum Route Optimization API", lifespan=lifespan)
+# orjson serializes the large graph payloads several times faster than the
+# stdlib json encoder.
+app = FastAPI(
+    title="Quantum Route Optimization API",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 # CORS (adjust origins if you want to lock it down)
 app.add_middleware(
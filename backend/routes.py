@@ -1,10 +1,13 @@
+import asyncio
 from fastapi import APIRouter, HTTPException
-from typing import List
+from typing import Any, Dict, List, Optional
+from datetime import datetime
 import time
+import uuid
 
 from models import Node, NodeCreate, RouteRequest, RouteResult
 from db import get_db
-from core import optimizer, build_graph_from_nodes, graph_visualization
+from core import optimizer, build_graph_from_nodes, graph_visualization, bump_nodes_version, QAOA_MAX_STOPS
 
 router = APIRouter()
 
@@ -16,14 +19,17 @@ async def root():
 @router.post("/nodes", response_model=Node)
 async def create_node(input: NodeCreate):
     db = await get_db()
-    node = Node(**input.dict())
-    await db.nodes.insert_one(node.dict())
-    return node
+    # Build the document once; input was already validated by NodeCreate, so
+    # the response model can skip a second validation pass via model_construct().
+    data = {"id": uuid.uuid4().hex, "timestamp": datetime.utcnow(), **input.model_dump()}
+    await db.nodes.insert_one(dict(data))
+    bump_nodes_version()
+    return Node.model_construct(**data)
 
 @router.get("/nodes", response_model=List[Node])
 async def get_nodes():
     db = await get_db()
-    nodes = await db.nodes.find().to_list(1000)
+    nodes = await db.nodes.find({}, {"_id": 0}).to_list(length=None)
     return [Node(**n) for n in nodes]
 
 @router.delete("/nodes/{node_id}")
@@ -32,35 +38,40 @@ async def delete_node(node_id: str):
     result = await db.nodes.delete_one({"id": node_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Node not found")
+    bump_nodes_version()
     return {"message": "Node deleted successfully"}
 
 # --------- Routing ----------
 @router.post("/route/optimize", response_model=RouteResult)
 async def optimize_route(request: RouteRequest):
-    print(f"Received raw request body: {request.dict()}")
+    print(f"Received raw request body: {request.model_dump()}")
     graph = await build_graph_from_nodes(node_ids=request.stops)
 
-    if len(graph.nodes) != len(request.stops):
+    if len(graph.node_ids) != len(request.stops):
         raise HTTPException(status_code=404, detail="One or more selected nodes were not found in the database.")
 
     # Check that all stops exist
     for stop in request.stops:
-        if stop not in graph.nodes:
+        if stop not in graph.idx:
             raise HTTPException(status_code=404, detail=f"Node {stop} not found")
 
     t0 = time.time()
     algo = request.algorithm.lower()
 
-    if algo == "dijkstra":
-        path, distance = optimizer.solve_multi_stop(graph, request.stops, "dijkstra")
-    elif algo == "qaoa":
-        if len(request.stops) > 5:
-            raise HTTPException(status_code=400, detail="QAOA TSP is too slow for more than 5 stops.")
+    if algo == "qaoa":
+        if len(request.stops) > QAOA_MAX_STOPS:
+            raise HTTPException(status_code=400, detail=f"QAOA TSP is too slow for more than {QAOA_MAX_STOPS} stops.")
         if len(request.stops) < 3:
             raise HTTPException(status_code=400, detail="QAOA TSP requires at least 3 stops.")
-        path, distance = optimizer.solve_multi_stop(graph, request.stops, "qaoa")
-    else:
-        raise HTTPException(status_code=400, detail="Invalid algorithm. Use 'dijkstra' or 'qaoa'")
+    elif algo not in ("dijkstra", "quantum-inspired"):
+        raise HTTPException(status_code=400, detail="Invalid algorithm. Use 'dijkstra', 'quantum-inspired' or 'qaoa'")
+
+    # The solvers are pure CPU (QAOA can run for seconds); run them on the
+    # threadpool so the event loop keeps serving other requests meanwhile.
+    loop = asyncio.get_running_loop()
+    path, distance = await loop.run_in_executor(
+        None, optimizer.solve_multi_stop, graph, request.stops, algo
+    )
 
     exec_time = time.time() - t0
     if not path:
@@ -75,25 +86,75 @@ async def optimize_route(request: RouteRequest):
         distance=distance,
         execution_time=exec_time,
     )
-    await db.route_results.insert_one(result.dict())
+    await db.route_results.insert_one(result.model_dump())
     return result
 
 @router.get("/route/results", response_model=List[RouteResult])
-async def get_route_results():
+async def get_route_results(limit: Optional[int] = None):
     db = await get_db()
-    results = await db.route_results.find().to_list(1000)
-    return [RouteResult(**r) for r in results]
+    # Stream the (potentially growing) history cursor instead of
+    # materializing it in one to_list call; _id is dropped at the server.
+    cursor = db.route_results.find({}, {"_id": 0})
+    if limit is not None:
+        # Newest-first off the timestamp index; callers that only need the
+        # latest entries avoid downloading the whole ever-growing history.
+        cursor = cursor.sort("timestamp", -1).limit(limit)
+    results = []
+    async for r in cursor:
+        results.append(RouteResult(**r))
+    return results
 
 # --------- Graph ----------
 @router.get("/graph/visualization")
-async def get_graph_visualization():
-    return await graph_visualization()
+async def get_graph_visualization(
+    max_edges: Optional[int] = None,
+    min_weight: Optional[float] = None,
+    fmt: str = "edges",
+):
+    return await graph_visualization(max_edges=max_edges, min_weight=min_weight, fmt=fmt)
+
+# --------- Batch ----------
+# Read-only endpoints callable through /batch; anything else 404s so the
+# batch surface cannot mutate state.
+_BATCH_HANDLERS = {
+    "/": root,
+    "/nodes": get_nodes,
+    "/route/results": get_route_results,
+    "/graph/visualization": get_graph_visualization,
+}
+
+@router.post("/batch")
+async def batch(calls: List[Dict[str, Any]]):
+    """Run several read-only sub-requests in one round-trip.
+
+    Accepts [{"method": "GET", "path": "/nodes", "params": {...}}, ...] and
+    returns [{"status": ..., "body": ...}, ...] in the same order.
+    """
+    async def _one(call: Dict[str, Any]) -> Dict[str, Any]:
+        method = str(call.get("method", "GET")).upper()
+        handler = _BATCH_HANDLERS.get(call.get("path")) if method == "GET" else None
+        if handler is None:
+            return {"status": 404, "body": {"detail": "Unknown batch path"}}
+        try:
+            return {"status": 200, "body": await handler(**call.get("params", {}))}
+        except HTTPException as exc:
+            return {"status": exc.status_code, "body": {"detail": exc.detail}}
+        except TypeError as exc:
+            # Params are passed straight to the handler, so unknown names or
+            # wrong types surface here instead of FastAPI's query validation.
+            return {"status": 400, "body": {"detail": f"Invalid params: {exc}"}}
+        except Exception:
+            # One broken sub-request must not take down the whole batch.
+            return {"status": 500, "body": {"detail": "Internal error in batch call"}}
+
+    return list(await asyncio.gather(*(_one(call) for call in calls)))
 
 # --------- Demo ----------
 @router.post("/demo/create-sample-nodes")
 async def create_sample_nodes():
     db = await get_db()
     await db.nodes.delete_many({})
+    bump_nodes_version()
 
     sample_nodes = [
     {"name": "Gandhipuram Central Bus Stand", "lat": 11.0183, "lng": 76.9685},
@@ -108,10 +169,8 @@ async def create_sample_nodes():
     {"name": "Tidel Park Coimbatore", "lat": 11.0238, "lng": 77.0294},
 ]
 
-    created = []
-    for data in sample_nodes:
-        node = Node(**data)
-        await db.nodes.insert_one(node.dict())
-        created.append(node.dict())
+    # One batched insert instead of a Mongo round-trip per node.
+    created = [Node(**data).model_dump() for data in sample_nodes]
+    await db.nodes.insert_many([dict(doc) for doc in created])
 
     return {"message": f"Created {len(created)} sample nodes", "nodes": created}
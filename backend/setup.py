@@ -0,0 +1,17 @@
+"""Builds the optional Cython haversine kernel: python setup.py build_ext --inplace"""
+from setuptools import Extension, setup
+from Cython.Build import cythonize
+
+extensions = [
+    Extension(
+        "_haversine",
+        ["_haversine.pyx"],
+        extra_compile_args=["-O3", "-fno-math-errno", "-fopenmp"],
+        extra_link_args=["-fopenmp"],
+    )
+]
+
+setup(
+    name="quantum-optimization-kernels",
+    ext_modules=cythonize(extensions, language_level=3),
+)
@@ -4,22 +4,213 @@ Comprehensive Backend Testing for Quantum Route Optimization System
 Tests all API endpoints including QAOA and Dijkstra algorithms
 """
 
-import requests
-import json
+import asyncio
+import httpx
+import msgspec
+import orjson
+import os
 import time
-import sys
-from typing import Dict, List, Any
+from dataclasses import dataclass
+from typing import Callable, List, Any, Optional, Tuple
 
 # Get backend URL from environment
 BACKEND_URL = "https://0f0323c4-560c-4e79-957c-05eeb4b5d17c.preview.emergentagent.com/api"
 
+def _json(response):
+    """Decode a response body with orjson (C-speed, matters for /graph payloads)."""
+    return orjson.loads(response.content)
+
+# POST bodies are serialized with orjson up front and sent as raw bytes, so
+# httpx never falls back to the stdlib encoder on the hot path.
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+def _jbody(payload):
+    return orjson.dumps(payload)
+
+class _DevCache:
+    """Disk cache for the read-only batch fetches, for iterative local runs.
+
+    Enabled with QTEST_DEV_CACHE=1; entries expire after 60s so a stale
+    backend is never masked for long. The seeding POST is cached too: a
+    replayed seed means the backend still holds exactly the node set the
+    other cached bodies were read from, while a live reseed regenerates
+    every node id and therefore clears the cache outright rather than
+    waiting for the TTL. QTEST_FORCE_FRESH=1 starts from an empty cache.
+    CI runs leave it off and always exercise the backend.
+    """
+
+    TTL = 60
+    PATH = ".qtest_cache.json"
+
+    def __init__(self):
+        try:
+            with open(self.PATH, "rb") as fh:
+                self._data = orjson.loads(fh.read())
+        except Exception:
+            self._data = {}
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry and time.time() - entry["t"] < self.TTL:
+            return entry["body"]
+        return None
+
+    def put(self, key, body):
+        self._data[key] = {"t": time.time(), "body": body}
+        with open(self.PATH, "wb") as fh:
+            fh.write(orjson.dumps(self._data))
+
+    def clear(self):
+        self._data = {}
+        try:
+            os.remove(self.PATH)
+        except OSError:
+            pass
+
+class _AsyncReader:
+    """File-like adapter feeding an httpx byte stream to ijson's async parser."""
+
+    def __init__(self, aiter):
+        self._aiter = aiter
+        self._buf = b""
+
+    async def read(self, n):
+        while len(self._buf) < n:
+            try:
+                self._buf += await self._aiter.__anext__()
+            except StopAsyncIteration:
+                break
+        out, self._buf = self._buf[:n], self._buf[n:]
+        return out
+
+# Field sets for the checks that inspect plain dicts; one C-level issubset
+# call instead of a Python membership loop per field.
+REQUIRED_NODE_FIELDS = frozenset({"id", "name", "lat", "lng"})
+REQUIRED_EDGE_FIELDS = frozenset({"from", "to", "weight"})
+
+# Response shapes, validated in one C-level pass by msgspec instead of
+# per-field Python membership loops. Unknown fields are ignored, so these
+# only pin the contract the tests rely on.
+class NodeSchema(msgspec.Struct):
+    id: str
+    name: str
+    lat: float
+    lng: float
+    timestamp: str
+
+class VisNodeSchema(msgspec.Struct):
+    id: str
+    name: str
+    lat: float
+    lng: float
+
+class EdgeSchema(msgspec.Struct, rename={"from_": "from"}):
+    from_: str
+    to: str
+    weight: float
+
+class RouteResultSchema(msgspec.Struct):
+    algorithm: str
+    start_node_id: str
+    end_node_id: str
+    path: List[str]
+    distance: float
+    execution_time: float
+
+@dataclass
+class TestSpec:
+    """One request-validate-log test case, run uniformly by _run_case."""
+    name: str
+    method: str
+    path: str
+    payload: Any = None
+    expect_status: int = 200
+    # (tester, decoded body) -> (success, message, details)
+    validator: Optional[Callable[[Any, Any], Tuple[bool, str, Any]]] = None
+    error_label: str = "Request error"
+    # Response may be replayed from the dev disk cache (see _DevCache)
+    dev_cacheable: bool = False
+    # Serialized once at definition time, not per request
+    body: Optional[bytes] = None
+
+    def __post_init__(self):
+        if self.payload is not None:
+            self.body = _jbody(self.payload)
+
+def _check_health(tester, data):
+    if "message" in data and "Quantum Route Optimization API" in data["message"]:
+        return True, "API is responding correctly", None
+    return False, "Unexpected response format", data
+
+def _check_sample_data(tester, data):
+    if "nodes" in data and len(data["nodes"]) == 10:
+        tester.sample_nodes = data["nodes"]
+        return True, f"Created {len(data['nodes'])} sample nodes", None
+    return False, "Unexpected response format", data
+
+# Simple endpoint checks, kept declarative so cross-cutting changes to how
+# tests are issued (batching, caching, timing) land once in _run_case.
+TESTS = [
+    TestSpec("API Health Check", "GET", "/", validator=_check_health,
+             error_label="Connection error"),
+    TestSpec("Sample Data Generation", "POST", "/demo/create-sample-nodes",
+             validator=_check_sample_data, dev_cacheable=True),
+]
+
+# Prerequisite DAG: a test whose parents did not all pass is skipped rather
+# than fired against a backend already known to be broken, and reported as a
+# skip so the pass/fail totals stay honest.
+DEPS = {
+    "api_health": set(),
+    "sample_data": {"api_health"},
+    "get_nodes": {"sample_data"},
+    "graph_visualization": {"sample_data"},
+    "create_node": {"api_health"},
+    "delete_node": {"create_node"},
+    "route_dijkstra": {"get_nodes"},
+    "route_qaoa": {"get_nodes"},
+    "route_history": {"api_health"},
+    "error_handling": {"get_nodes"},
+}
+
+# Matching keys for the declarative TESTS entries, in order
+_SPEC_KEYS = ["api_health", "sample_data"]
+
 class QuantumRouteOptimizerTester:
     def __init__(self):
         self.base_url = BACKEND_URL
-        self.session = requests.Session()
+        self.session = None
         self.test_results = []
         self.sample_nodes = []
-        
+        self._nodes_cache = None
+        self._dev_cache = _DevCache() if os.environ.get("QTEST_DEV_CACHE") else None
+        if self._dev_cache is not None and os.environ.get("QTEST_FORCE_FRESH"):
+            self._dev_cache.clear()
+        self._passed = set()
+        self._skipped = []
+        # Wall clock is read once; per-entry stamps use the monotonic
+        # perf counter, which is cheaper and sub-ms accurate.
+        self.suite_start_wall = time.time()
+        self._suite_start_ns = time.perf_counter_ns()
+
+    async def __aenter__(self):
+        # One client for the whole run. HTTP/2 multiplexes every concurrent
+        # request over a single TLS connection, so gather()ed tests share one
+        # handshake instead of opening a socket each. Keep-alive is pinned
+        # past the suite's duration so the pool never re-handshakes, and
+        # connect-level retries smooth over transient resets to the remote
+        # host.
+        transport = httpx.AsyncHTTPTransport(
+            http2=True,
+            retries=2,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=20, keepalive_expiry=30),
+        )
+        self.session = httpx.AsyncClient(base_url=self.base_url, timeout=30, transport=transport)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.session.aclose()
+
     def log_test(self, test_name: str, success: bool, message: str, details: Any = None):
         """Log test results"""
         result = {
@@ -27,80 +218,111 @@ class QuantumRouteOptimizerTester:
             "success": success,
             "message": message,
             "details": details,
-            "timestamp": time.time()
+            "timestamp_ns": time.perf_counter_ns() - self._suite_start_ns
         }
         self.test_results.append(result)
         status = "✅ PASS" if success else "❌ FAIL"
         print(f"{status} {test_name}: {message}")
         if details and not success:
             print(f"   Details: {details}")
-    
-    def test_api_health(self):
-        """Test basic API health check"""
-        try:
-            response = self.session.get(f"{self.base_url}/")
-            if response.status_code == 200:
-                data = response.json()
-                if "message" in data and "Quantum Route Optimization API" in data["message"]:
-                    self.log_test("API Health Check", True, "API is responding correctly")
-                    return True
-                else:
-                    self.log_test("API Health Check", False, "Unexpected response format", data)
-                    return False
-            else:
-                self.log_test("API Health Check", False, f"HTTP {response.status_code}", response.text)
-                return False
-        except Exception as e:
-            self.log_test("API Health Check", False, f"Connection error: {str(e)}")
+
+    def _skip_unless_ready(self, key: str, label: str) -> bool:
+        """True (and logs a SKIP) when one of the test's prerequisites failed."""
+        missing = DEPS.get(key, set()) - self._passed
+        if not missing:
             return False
-    
-    def test_sample_data_generation(self):
-        """Test sample data generation endpoint"""
+        self._skipped.append(key)
+        print(f"⏭️  SKIP {label}: prerequisite failed ({', '.join(sorted(missing))})")
+        return True
+
+    async def _run_case(self, spec: TestSpec):
+        """Issue one TestSpec's request, check status, validate and log."""
+        cache_key = f"{spec.method} {spec.path}"
+        if spec.dev_cacheable and self._dev_cache is not None:
+            hit = self._dev_cache.get(cache_key)
+            if hit is not None:
+                # Replayed body: the run that cached it left the backend in
+                # exactly this state, and for the seeding POST the replay
+                # also skips the reseed, so the other cached entries (keyed
+                # to the same node ids) stay valid.
+                success, message, details = spec.validator(self, hit)
+                self.log_test(spec.name, success, f"{message} (dev cache)", details)
+                return success
         try:
-            response = self.session.post(f"{self.base_url}/demo/create-sample-nodes")
-            if response.status_code == 200:
-                data = response.json()
-                if "nodes" in data and len(data["nodes"]) == 10:
-                    self.sample_nodes = data["nodes"]
-                    self.log_test("Sample Data Generation", True, f"Created {len(data['nodes'])} sample nodes")
-                    return True
-                else:
-                    self.log_test("Sample Data Generation", False, "Unexpected response format", data)
-                    return False
-            else:
-                self.log_test("Sample Data Generation", False, f"HTTP {response.status_code}", response.text)
+            response = await self.session.request(
+                spec.method, spec.path, content=spec.body,
+                headers=_JSON_HEADERS if spec.body is not None else None,
+            )
+            if response.status_code != spec.expect_status:
+                self.log_test(spec.name, False, f"HTTP {response.status_code}", response.text)
                 return False
+            if spec.method != "GET":
+                # A live mutation: every replayable body on disk predates it.
+                self._nodes_cache = None
+                if self._dev_cache is not None:
+                    self._dev_cache.clear()
+            data = _json(response)
+            success, message, details = spec.validator(self, data)
+            if success and spec.dev_cacheable and self._dev_cache is not None:
+                self._dev_cache.put(cache_key, data)
+            self.log_test(spec.name, success, message, details)
+            return success
         except Exception as e:
-            self.log_test("Sample Data Generation", False, f"Request error: {str(e)}")
+            self.log_test(spec.name, False, f"{spec.error_label}: {str(e)}")
             return False
-    
-    def test_get_nodes(self):
-        """Test retrieving all nodes"""
+
+    async def _batch(self, calls):
+        """POST a group of read-only sub-requests to /batch in one round-trip.
+
+        Returns the list of {"status", "body"} sub-responses, or None when
+        the batch call itself fails.
+        """
+        body = _jbody(calls)
+        if self._dev_cache is not None:
+            hit = self._dev_cache.get(body.decode())
+            if hit is not None:
+                return hit
         try:
-            response = self.session.get(f"{self.base_url}/nodes")
-            if response.status_code == 200:
-                nodes = response.json()
-                if isinstance(nodes, list) and len(nodes) >= 10:
-                    # Verify node structure
-                    sample_node = nodes[0]
-                    required_fields = ["id", "name", "lat", "lng", "timestamp"]
-                    if all(field in sample_node for field in required_fields):
-                        self.log_test("Get Nodes", True, f"Retrieved {len(nodes)} nodes with correct structure")
-                        return True
-                    else:
-                        self.log_test("Get Nodes", False, "Node structure missing required fields", sample_node)
-                        return False
-                else:
-                    self.log_test("Get Nodes", False, f"Expected at least 10 nodes, got {len(nodes) if isinstance(nodes, list) else 'invalid format'}")
-                    return False
-            else:
-                self.log_test("Get Nodes", False, f"HTTP {response.status_code}", response.text)
+            response = await self.session.post("/batch", content=body, headers=_JSON_HEADERS)
+            if response.status_code != 200:
+                return None
+            subs = _json(response)
+        except Exception:
+            return None
+        if self._dev_cache is not None:
+            self._dev_cache.put(body.decode(), subs)
+        return subs
+
+    async def _get_nodes(self):
+        """Current node list; served from cache unless a mutation invalidated it."""
+        if self._nodes_cache is None:
+            response = await self.session.get("/nodes")
+            if response.status_code != 200:
+                return []
+            self._nodes_cache = _json(response)
+        return self._nodes_cache
+
+    def test_get_nodes(self, sub):
+        """Validate the /nodes sub-response from a batch call"""
+        if sub is None or sub.get("status") != 200:
+            self.log_test("Get Nodes", False, f"HTTP {sub.get('status') if sub else 'batch error'}")
+            return False
+        nodes = sub["body"]
+        self._nodes_cache = nodes if isinstance(nodes, list) else None
+        if isinstance(nodes, list) and len(nodes) >= 10:
+            # Verify node structure for the whole list in one validated pass
+            try:
+                msgspec.convert(nodes, type=List[NodeSchema])
+            except msgspec.ValidationError as err:
+                self.log_test("Get Nodes", False, "Node structure missing required fields", str(err))
                 return False
-        except Exception as e:
-            self.log_test("Get Nodes", False, f"Request error: {str(e)}")
+            self.log_test("Get Nodes", True, f"Retrieved {len(nodes)} nodes with correct structure")
+            return True
+        else:
+            self.log_test("Get Nodes", False, f"Expected at least 10 nodes, got {len(nodes) if isinstance(nodes, list) else 'invalid format'}")
             return False
-    
-    def test_create_custom_node(self):
+
+    async def test_create_custom_node(self):
         """Test creating a custom node"""
         try:
             custom_node = {
@@ -108,14 +330,17 @@ class QuantumRouteOptimizerTester:
                 "lat": 40.7580,
                 "lng": -73.9855
             }
-            
-            response = self.session.post(f"{self.base_url}/nodes", json=custom_node)
+
+            response = await self.session.post("/nodes", content=_jbody(custom_node), headers=_JSON_HEADERS)
             if response.status_code == 200:
-                node = response.json()
-                if all(field in node for field in ["id", "name", "lat", "lng"]):
-                    if (node["name"] == custom_node["name"] and 
-                        node["lat"] == custom_node["lat"] and 
+                node = _json(response)
+                if REQUIRED_NODE_FIELDS.issubset(node.keys()):
+                    if (node["name"] == custom_node["name"] and
+                        node["lat"] == custom_node["lat"] and
                         node["lng"] == custom_node["lng"]):
+                        # Only the in-memory list: the test node is deleted
+                        # again below, so replayable disk entries stay valid.
+                        self._nodes_cache = None
                         self.log_test("Create Custom Node", True, f"Created node: {node['name']}")
                         return True, node["id"]
                     else:
@@ -130,14 +355,15 @@ class QuantumRouteOptimizerTester:
         except Exception as e:
             self.log_test("Create Custom Node", False, f"Request error: {str(e)}")
             return False, None
-    
-    def test_delete_node(self, node_id: str):
+
+    async def test_delete_node(self, node_id: str):
         """Test deleting a node"""
         try:
-            response = self.session.delete(f"{self.base_url}/nodes/{node_id}")
+            response = await self.session.delete(f"/nodes/{node_id}")
             if response.status_code == 200:
-                data = response.json()
+                data = _json(response)
                 if "message" in data and "deleted successfully" in data["message"]:
+                    self._nodes_cache = None  # mutation; force a refetch
                     self.log_test("Delete Node", True, f"Successfully deleted node {node_id}")
                     return True
                 else:
@@ -149,302 +375,330 @@ class QuantumRouteOptimizerTester:
         except Exception as e:
             self.log_test("Delete Node", False, f"Request error: {str(e)}")
             return False
-    
-    def test_graph_visualization(self):
-        """Test graph visualization endpoint"""
-        try:
-            response = self.session.get(f"{self.base_url}/graph/visualization")
-            if response.status_code == 200:
-                data = response.json()
-                if "nodes" in data and "edges" in data:
-                    nodes = data["nodes"]
-                    edges = data["edges"]
-                    if len(nodes) >= 10 and len(edges) > 0:
-                        # Verify node structure
-                        sample_node = nodes[0]
-                        if all(field in sample_node for field in ["id", "name", "lat", "lng"]):
-                            # Verify edge structure
-                            sample_edge = edges[0]
-                            if all(field in sample_edge for field in ["from", "to", "weight"]):
-                                self.log_test("Graph Visualization", True, f"Retrieved {len(nodes)} nodes and {len(edges)} edges")
-                                return True
-                            else:
-                                self.log_test("Graph Visualization", False, "Invalid edge structure", sample_edge)
-                                return False
-                        else:
-                            self.log_test("Graph Visualization", False, "Invalid node structure", sample_node)
-                            return False
-                    else:
-                        self.log_test("Graph Visualization", False, f"Insufficient data: {len(nodes)} nodes, {len(edges)} edges")
-                        return False
-                else:
-                    self.log_test("Graph Visualization", False, "Missing nodes or edges in response", data)
+
+    def test_graph_visualization(self, sub):
+        """Validate the /graph/visualization sub-response from a batch call"""
+        if sub is None or sub.get("status") != 200:
+            self.log_test("Graph Visualization", False, f"HTTP {sub.get('status') if sub else 'batch error'}")
+            return False
+        data = sub["body"]
+        if "nodes" in data and "edges" in data:
+            nodes = data["nodes"]
+            edges = data["edges"]
+            if len(nodes) >= 10 and len(edges) > 0:
+                # Verify node structure
+                try:
+                    msgspec.convert(nodes, type=List[VisNodeSchema])
+                except msgspec.ValidationError as err:
+                    self.log_test("Graph Visualization", False, "Invalid node structure", str(err))
+                    return False
+                # Verify edge structure
+                try:
+                    msgspec.convert(edges, type=List[EdgeSchema])
+                except msgspec.ValidationError as err:
+                    self.log_test("Graph Visualization", False, "Invalid edge structure", str(err))
                     return False
+                self.log_test("Graph Visualization", True, f"Retrieved {len(nodes)} nodes and {len(edges)} edges")
+                return True
             else:
-                self.log_test("Graph Visualization", False, f"HTTP {response.status_code}", response.text)
+                self.log_test("Graph Visualization", False, f"Insufficient data: {len(nodes)} nodes, {len(edges)} edges")
                 return False
-        except Exception as e:
-            self.log_test("Graph Visualization", False, f"Request error: {str(e)}")
+        else:
+            self.log_test("Graph Visualization", False, "Missing nodes or edges in response", data)
             return False
-    
-    def test_route_optimization_dijkstra(self):
-        """Test route optimization using Dijkstra algorithm"""
+
+    async def test_graph_visualization_streaming(self):
+        """Streaming variant of the graph check for very large graphs.
+
+        Enabled with QTEST_STREAM_GRAPH=1: one ijson pass over the response
+        stream collects counts and first-item keys in O(1) memory instead of
+        materializing the O(n^2) edge list.
+        """
+        # Deferred: only this opt-in path needs ijson, so runs without
+        # QTEST_STREAM_GRAPH=1 work even if it is not installed.
+        import ijson
         try:
-            # Get current nodes to select start and end points
-            nodes_response = self.session.get(f"{self.base_url}/nodes")
-            if nodes_response.status_code != 200:
-                self.log_test("Route Optimization (Dijkstra)", False, "Could not retrieve nodes for testing")
-                return False
-            
-            nodes = nodes_response.json()
-            if len(nodes) < 2:
-                self.log_test("Route Optimization (Dijkstra)", False, "Need at least 2 nodes for route optimization")
-                return False
-            
-            # Select first and last nodes as start and end
-            start_node = nodes[0]["id"]
-            end_node = nodes[-1]["id"]
-            
-            route_request = {
-                "start_node_id": start_node,
-                "end_node_id": end_node,
-                "algorithm": "dijkstra"
-            }
-            
-            start_time = time.time()
-            response = self.session.post(f"{self.base_url}/route/optimize", json=route_request)
-            execution_time = time.time() - start_time
-            
-            if response.status_code == 200:
-                result = response.json()
-                required_fields = ["algorithm", "start_node_id", "end_node_id", "path", "distance", "execution_time"]
-                if all(field in result for field in required_fields):
-                    if (result["algorithm"] == "dijkstra" and 
-                        result["start_node_id"] == start_node and 
-                        result["end_node_id"] == end_node and
-                        isinstance(result["path"], list) and len(result["path"]) >= 2 and
-                        isinstance(result["distance"], (int, float)) and result["distance"] >= 0 and
-                        isinstance(result["execution_time"], (int, float))):
-                        
-                        self.log_test("Route Optimization (Dijkstra)", True, 
-                                    f"Path found: {len(result['path'])} nodes, distance: {result['distance']:.2f}km, time: {result['execution_time']:.3f}s")
-                        return True
-                    else:
-                        self.log_test("Route Optimization (Dijkstra)", False, "Invalid result data", result)
-                        return False
-                else:
-                    self.log_test("Route Optimization (Dijkstra)", False, "Missing required fields", result)
+            node_count = edge_count = 0
+            node_keys, edge_keys = set(), set()
+            async with self.session.stream("GET", "/graph/visualization") as response:
+                if response.status_code != 200:
+                    self.log_test("Graph Visualization", False, f"HTTP {response.status_code}")
+                    return False
+                reader = _AsyncReader(response.aiter_bytes())
+                async for prefix, event, value in ijson.parse(reader):
+                    if event == "start_map":
+                        if prefix == "nodes.item":
+                            node_count += 1
+                        elif prefix == "edges.item":
+                            edge_count += 1
+                    elif event == "map_key":
+                        if prefix == "nodes.item" and node_count == 1:
+                            node_keys.add(value)
+                        elif prefix == "edges.item" and edge_count == 1:
+                            edge_keys.add(value)
+
+            if node_count >= 10 and edge_count > 0:
+                if not REQUIRED_NODE_FIELDS.issubset(node_keys):
+                    self.log_test("Graph Visualization", False, "Invalid node structure", sorted(node_keys))
                     return False
+                if not REQUIRED_EDGE_FIELDS.issubset(edge_keys):
+                    self.log_test("Graph Visualization", False, "Invalid edge structure", sorted(edge_keys))
+                    return False
+                self.log_test("Graph Visualization", True, f"Retrieved {node_count} nodes and {edge_count} edges")
+                return True
             else:
-                self.log_test("Route Optimization (Dijkstra)", False, f"HTTP {response.status_code}", response.text)
+                self.log_test("Graph Visualization", False, f"Insufficient data: {node_count} nodes, {edge_count} edges")
                 return False
         except Exception as e:
-            self.log_test("Route Optimization (Dijkstra)", False, f"Request error: {str(e)}")
+            self.log_test("Graph Visualization", False, f"Request error: {str(e)}")
             return False
-    
-    def test_route_optimization_qaoa(self):
-        """Test route optimization using QAOA algorithm"""
+
+    async def _run_route(self, label: str, algo: str, stops):
+        """POST /route/optimize and validate the result; shared by both route tests."""
         try:
-            # Get current nodes to select start and end points
-            nodes_response = self.session.get(f"{self.base_url}/nodes")
-            if nodes_response.status_code != 200:
-                self.log_test("Route Optimization (QAOA)", False, "Could not retrieve nodes for testing")
-                return False
-            
-            nodes = nodes_response.json()
-            if len(nodes) < 2:
-                self.log_test("Route Optimization (QAOA)", False, "Need at least 2 nodes for route optimization")
-                return False
-            
-            # Select different nodes for QAOA test
-            start_node = nodes[1]["id"] if len(nodes) > 1 else nodes[0]["id"]
-            end_node = nodes[2]["id"] if len(nodes) > 2 else nodes[-1]["id"]
-            
-            route_request = {
-                "start_node_id": start_node,
-                "end_node_id": end_node,
-                "algorithm": "qaoa"
-            }
-            
-            start_time = time.time()
-            response = self.session.post(f"{self.base_url}/route/optimize", json=route_request)
-            execution_time = time.time() - start_time
-            
+            route_request = {"stops": stops, "algorithm": algo}
+            response = await self.session.post("/route/optimize", content=_jbody(route_request), headers=_JSON_HEADERS)
+
             if response.status_code == 200:
-                result = response.json()
-                required_fields = ["algorithm", "start_node_id", "end_node_id", "path", "distance", "execution_time"]
-                if all(field in result for field in required_fields):
-                    if (result["algorithm"] == "qaoa" and 
-                        result["start_node_id"] == start_node and 
-                        result["end_node_id"] == end_node and
-                        isinstance(result["path"], list) and len(result["path"]) >= 2 and
-                        isinstance(result["distance"], (int, float)) and result["distance"] >= 0 and
-                        isinstance(result["execution_time"], (int, float))):
-                        
-                        self.log_test("Route Optimization (QAOA)", True, 
-                                    f"Path found: {len(result['path'])} nodes, distance: {result['distance']:.2f}km, time: {result['execution_time']:.3f}s")
-                        return True
-                    else:
-                        self.log_test("Route Optimization (QAOA)", False, "Invalid result data", result)
-                        return False
+                try:
+                    result = msgspec.json.decode(response.content, type=RouteResultSchema)
+                except msgspec.ValidationError as err:
+                    self.log_test(label, False, "Missing required fields", str(err))
+                    return False
+                if (result.algorithm == algo and
+                    result.start_node_id == stops[0] and
+                    result.end_node_id == stops[-1] and
+                    len(result.path) >= 2 and
+                    result.distance >= 0):
+
+                    self.log_test(label, True,
+                                f"Path found: {len(result.path)} nodes, distance: {result.distance:.2f}km, time: {result.execution_time:.3f}s")
+                    return True
                 else:
-                    self.log_test("Route Optimization (QAOA)", False, "Missing required fields", result)
+                    self.log_test(label, False, "Invalid result data", result)
                     return False
             else:
-                self.log_test("Route Optimization (QAOA)", False, f"HTTP {response.status_code}", response.text)
+                self.log_test(label, False, f"HTTP {response.status_code}", response.text)
                 return False
         except Exception as e:
-            self.log_test("Route Optimization (QAOA)", False, f"Request error: {str(e)}")
+            self.log_test(label, False, f"Request error: {str(e)}")
             return False
-    
-    def test_route_results_history(self):
-        """Test retrieving route optimization results history"""
-        try:
-            response = self.session.get(f"{self.base_url}/route/results")
-            if response.status_code == 200:
-                results = response.json()
-                if isinstance(results, list):
-                    if len(results) >= 2:  # Should have at least 2 results from previous tests
-                        sample_result = results[0]
-                        required_fields = ["algorithm", "start_node_id", "end_node_id", "path", "distance", "execution_time"]
-                        if all(field in sample_result for field in required_fields):
-                            self.log_test("Route Results History", True, f"Retrieved {len(results)} route optimization results")
-                            return True
-                        else:
-                            self.log_test("Route Results History", False, "Invalid result structure", sample_result)
-                            return False
-                    else:
-                        self.log_test("Route Results History", True, f"Retrieved {len(results)} results (may be empty initially)")
-                        return True
-                else:
-                    self.log_test("Route Results History", False, "Expected list of results", results)
+
+    async def test_route_optimization_dijkstra(self):
+        """Test route optimization using Dijkstra algorithm"""
+        # Cached from earlier tests; only refetched after a mutation
+        nodes = await self._get_nodes()
+        if len(nodes) < 2:
+            self.log_test("Route Optimization (Dijkstra)", False, "Need at least 2 nodes for route optimization")
+            return False
+
+        # Select first and last nodes as start and end
+        stops = [nodes[0]["id"], nodes[-1]["id"]]
+        return await self._run_route("Route Optimization (Dijkstra)", "dijkstra", stops)
+
+    async def test_route_optimization_qaoa(self):
+        """Test route optimization using QAOA algorithm"""
+        # Cached from earlier tests; only refetched after a mutation
+        nodes = await self._get_nodes()
+        if len(nodes) < 3:
+            self.log_test("Route Optimization (QAOA)", False, "Need at least 3 nodes for QAOA route optimization")
+            return False
+
+        # QAOA solves a tour, so give it three stops
+        stops = [nodes[1]["id"], nodes[2]["id"], nodes[3]["id"] if len(nodes) > 3 else nodes[0]["id"]]
+        return await self._run_route("Route Optimization (QAOA)", "qaoa", stops)
+
+    def test_route_results_history(self, sub):
+        """Validate the /route/results sub-response from a batch call"""
+        if sub is None or sub.get("status") != 200:
+            self.log_test("Route Results History", False, f"HTTP {sub.get('status') if sub else 'batch error'}")
+            return False
+        results = sub["body"]
+        if isinstance(results, list):
+            if len(results) >= 1:  # The route tests above stored results
+                try:
+                    msgspec.convert(results, type=List[RouteResultSchema])
+                except msgspec.ValidationError as err:
+                    self.log_test("Route Results History", False, "Invalid result structure", str(err))
                     return False
+                # Value checks run column-wise so they stay cheap even when a
+                # load run leaves thousands of history rows. Deferred import:
+                # only this validator needs pandas.
+                import pandas as pd
+                df = pd.DataFrame(results)
+                if not (df["distance"].ge(0).all() and df["path"].map(len).ge(2).all()):
+                    self.log_test("Route Results History", False, "Invalid result values",
+                                  df[["distance"]].describe().to_dict())
+                    return False
+                self.log_test("Route Results History", True, f"Retrieved {len(results)} route optimization results")
+                return True
             else:
-                self.log_test("Route Results History", False, f"HTTP {response.status_code}", response.text)
-                return False
-        except Exception as e:
-            self.log_test("Route Results History", False, f"Request error: {str(e)}")
+                self.log_test("Route Results History", True, f"Retrieved {len(results)} results (may be empty initially)")
+                return True
+        else:
+            self.log_test("Route Results History", False, "Expected list of results", results)
             return False
-    
-    def test_error_handling(self):
+
+    async def test_error_handling(self):
         """Test error handling for invalid requests"""
         try:
-            # Test invalid algorithm
-            invalid_request = {
-                "start_node_id": "invalid_id",
-                "end_node_id": "invalid_id",
-                "algorithm": "invalid_algorithm"
-            }
-            
-            response = self.session.post(f"{self.base_url}/route/optimize", json=invalid_request)
-            if response.status_code == 400:
-                self.log_test("Error Handling (Invalid Algorithm)", True, "Correctly rejected invalid algorithm")
-            else:
-                self.log_test("Error Handling (Invalid Algorithm)", False, f"Expected 400, got {response.status_code}")
-            
+            # Valid node ids (cached) so the algorithm check is what fails
+            nodes = await self._get_nodes()
+
+            if len(nodes) >= 2:
+                invalid_request = {
+                    "stops": [nodes[0]["id"], nodes[1]["id"]],
+                    "algorithm": "invalid_algorithm"
+                }
+                response = await self.session.post("/route/optimize", content=_jbody(invalid_request), headers=_JSON_HEADERS)
+                if response.status_code == 400:
+                    self.log_test("Error Handling (Invalid Algorithm)", True, "Correctly rejected invalid algorithm")
+                else:
+                    self.log_test("Error Handling (Invalid Algorithm)", False, f"Expected 400, got {response.status_code}")
+
             # Test invalid node IDs
-            nodes_response = self.session.get(f"{self.base_url}/nodes")
-            if nodes_response.status_code == 200:
-                nodes = nodes_response.json()
-                if nodes:
-                    valid_request = {
-                        "start_node_id": "nonexistent_id",
-                        "end_node_id": nodes[0]["id"],
-                        "algorithm": "dijkstra"
-                    }
-                    
-                    response = self.session.post(f"{self.base_url}/route/optimize", json=valid_request)
-                    if response.status_code == 404:
-                        self.log_test("Error Handling (Invalid Node ID)", True, "Correctly rejected invalid node ID")
-                        return True
-                    else:
-                        self.log_test("Error Handling (Invalid Node ID)", False, f"Expected 404, got {response.status_code}")
-                        return False
-            
+            if nodes:
+                valid_request = {
+                    "stops": ["nonexistent_id", nodes[0]["id"]],
+                    "algorithm": "dijkstra"
+                }
+
+                response = await self.session.post("/route/optimize", content=_jbody(valid_request), headers=_JSON_HEADERS)
+                if response.status_code == 404:
+                    self.log_test("Error Handling (Invalid Node ID)", True, "Correctly rejected invalid node ID")
+                    return True
+                else:
+                    self.log_test("Error Handling (Invalid Node ID)", False, f"Expected 404, got {response.status_code}")
+                    return False
+
             return True
         except Exception as e:
             self.log_test("Error Handling", False, f"Request error: {str(e)}")
             return False
-    
-    def run_all_tests(self):
+
+    async def run_all_tests(self):
         """Run all backend tests"""
         print("🚀 Starting Quantum Route Optimization Backend Tests")
         print("=" * 60)
-        
+
+        # Pay DNS + TCP + TLS once up front so the first measured test
+        # reflects server-side work, not connection setup (~3 RTTs).
+        try:
+            await self.session.head("/", timeout=5)
+        except Exception:
+            pass
+
         # Test sequence
         tests_passed = 0
         total_tests = 0
-        
-        # 1. Basic API Health
-        total_tests += 1
-        if self.test_api_health():
-            tests_passed += 1
-        
-        # 2. Sample Data Generation
-        total_tests += 1
-        if self.test_sample_data_generation():
-            tests_passed += 1
-        
-        # 3. Node Management
-        total_tests += 1
-        if self.test_get_nodes():
-            tests_passed += 1
-        
-        total_tests += 1
-        success, node_id = self.test_create_custom_node()
-        if success:
-            tests_passed += 1
-            
-            # Test delete if create was successful
+
+        # 1/2. Declarative cases: API health, then sample data generation
+        for key, spec in zip(_SPEC_KEYS, TESTS):
+            if self._skip_unless_ready(key, spec.name):
+                continue
             total_tests += 1
-            if self.test_delete_node(node_id):
+            if await self._run_case(spec):
                 tests_passed += 1
-        else:
-            total_tests += 1  # Count the delete test as failed
-        
-        # 4. Graph Visualization
-        total_tests += 1
-        if self.test_graph_visualization():
-            tests_passed += 1
-        
-        # 5. Route Optimization - Dijkstra
-        total_tests += 1
-        if self.test_route_optimization_dijkstra():
-            tests_passed += 1
-        
-        # 6. Route Optimization - QAOA
-        total_tests += 1
-        if self.test_route_optimization_qaoa():
-            tests_passed += 1
-        
-        # 7. Route Results History
-        total_tests += 1
-        if self.test_route_results_history():
-            tests_passed += 1
-        
+                self._passed.add(key)
+
+        # 3/4. Node listing and graph visualization are read-only — fetch
+        # both through /batch in a single round-trip and validate locally.
+        # On very large graphs, QTEST_STREAM_GRAPH=1 swaps the visualization
+        # check for a constant-memory ijson pass over the raw stream.
+        run_nodes = not self._skip_unless_ready("get_nodes", "Get Nodes")
+        run_graph = not self._skip_unless_ready("graph_visualization", "Graph Visualization")
+        if run_nodes or run_graph:
+            streaming_graph = bool(os.environ.get("QTEST_STREAM_GRAPH"))
+            calls = []
+            if run_nodes:
+                calls.append({"path": "/nodes"})
+            if run_graph and not streaming_graph:
+                calls.append({"path": "/graph/visualization"})
+            batch = await self._batch(calls) if calls else []
+            if run_nodes:
+                total_tests += 1
+                if self.test_get_nodes(batch[0] if batch else None):
+                    tests_passed += 1
+                    self._passed.add("get_nodes")
+            if run_graph:
+                total_tests += 1
+                if streaming_graph:
+                    ok = await self.test_graph_visualization_streaming()
+                else:
+                    ok = self.test_graph_visualization(batch[-1] if batch else None)
+                if ok:
+                    tests_passed += 1
+                    self._passed.add("graph_visualization")
+
+        if not self._skip_unless_ready("create_node", "Create Custom Node"):
+            total_tests += 1
+            success, node_id = await self.test_create_custom_node()
+            if success:
+                tests_passed += 1
+                self._passed.add("create_node")
+
+        if not self._skip_unless_ready("delete_node", "Delete Node"):
+            total_tests += 1
+            if await self.test_delete_node(node_id):
+                tests_passed += 1
+                self._passed.add("delete_node")
+
+        # 5/6. Route Optimization — the two solves are independent and QAOA
+        # dominates, so fire them together: wall time is max, not sum.
+        route_keys = [
+            ("route_dijkstra", "Route Optimization (Dijkstra)", self.test_route_optimization_dijkstra),
+            ("route_qaoa", "Route Optimization (QAOA)", self.test_route_optimization_qaoa),
+        ]
+        runnable = [(key, fn) for key, label, fn in route_keys
+                    if not self._skip_unless_ready(key, label)]
+        if runnable:
+            total_tests += len(runnable)
+            results = await asyncio.gather(*(fn() for _, fn in runnable))
+            for (key, _), passed in zip(runnable, results):
+                if passed:
+                    tests_passed += 1
+                    self._passed.add(key)
+
+        # 7. Route Results History — only the newest entry; the full history
+        # grows without bound and the test only checks structure.
+        if not self._skip_unless_ready("route_history", "Route Results History"):
+            total_tests += 1
+            history = await self._batch([{"path": "/route/results", "params": {"limit": 1}}])
+            if self.test_route_results_history(history[0] if history else None):
+                tests_passed += 1
+                self._passed.add("route_history")
+
         # 8. Error Handling
-        total_tests += 1
-        if self.test_error_handling():
-            tests_passed += 1
-        
+        if not self._skip_unless_ready("error_handling", "Error Handling"):
+            total_tests += 1
+            if await self.test_error_handling():
+                tests_passed += 1
+                self._passed.add("error_handling")
+
         # Summary
         print("\n" + "=" * 60)
-        print(f"🏁 Test Summary: {tests_passed}/{total_tests} tests passed")
-        
-        if tests_passed == total_tests:
+        summary = f"🏁 Test Summary: {tests_passed}/{total_tests} tests passed"
+        if self._skipped:
+            summary += f" ({len(self._skipped)} skipped)"
+        print(summary)
+
+        if tests_passed == total_tests and not self._skipped:
             print("🎉 All tests passed! Quantum Route Optimization backend is working correctly.")
             return True
         else:
-            print(f"⚠️  {total_tests - tests_passed} tests failed. Check the details above.")
+            print(f"⚠️  {total_tests - tests_passed + len(self._skipped)} tests did not pass. Check the details above.")
             return False
 
+async def _amain():
+    async with QuantumRouteOptimizerTester() as tester:
+        return await tester.run_all_tests()
+
 def main():
     """Main test execution"""
-    tester = QuantumRouteOptimizerTester()
-    success = tester.run_all_tests()
-    
+    success = asyncio.run(_amain())
+
     # Return appropriate exit code
-    sys.exit(0 if success else 1)
+    raise SystemExit(0 if success else 1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Load profile for the Quantum Route Optimization API.
+
+Runs the same checks as backend_test.py under configurable concurrency so
+p95/p99 latencies (the metric that matters for /route/optimize) can be
+measured and regressed against:
+
+    locust -u 20 -r 5 -t 5m --host=https://<backend-host>/api
+"""
+
+import random
+
+import requests
+from locust import HttpUser, between, events, task
+
+
+@events.test_start.add_listener
+def seed_sample_nodes(environment, **kwargs):
+    # Seed exactly once per run. /demo/create-sample-nodes wipes the node set
+    # and regenerates ids, so seeding from each user's on_start would 404 the
+    # cached ids of every user already running.
+    requests.post(f"{environment.host}/demo/create-sample-nodes", timeout=10)
+
+
+class QuantumUser(HttpUser):
+    wait_time = between(0.1, 1.0)
+
+    def on_start(self):
+        # Cache the current node ids for route calls; the data itself was
+        # seeded once in the test_start hook above.
+        response = self.client.get("/nodes")
+        self.node_ids = [n["id"] for n in response.json()]
+
+    @task(5)
+    def get_nodes(self):
+        with self.client.get("/nodes", catch_response=True) as response:
+            nodes = response.json()
+            if not isinstance(nodes, list) or len(nodes) < 2:
+                response.failure(f"Expected a node list, got {type(nodes).__name__}")
+
+    @task(3)
+    def graph_visualization(self):
+        with self.client.get("/graph/visualization", catch_response=True) as response:
+            data = response.json()
+            if "nodes" not in data or "edges" not in data:
+                response.failure("Missing nodes or edges in response")
+
+    @task(3)
+    def route_results_history(self):
+        with self.client.get("/route/results", catch_response=True) as response:
+            if not isinstance(response.json(), list):
+                response.failure("Expected list of results")
+
+    @task(2)
+    def optimize_dijkstra(self):
+        if len(self.node_ids) < 2:
+            return
+        stops = random.sample(self.node_ids, 2)
+        body = {"stops": stops, "algorithm": "dijkstra"}
+        with self.client.post("/route/optimize", json=body, catch_response=True) as response:
+            result = response.json()
+            if response.status_code != 200 or len(result.get("path", [])) < 2:
+                response.failure(f"Bad dijkstra result: HTTP {response.status_code}")
+
+    @task(1)
+    def optimize_qaoa(self):
+        if len(self.node_ids) < 3:
+            return
+        stops = random.sample(self.node_ids, 3)
+        body = {"stops": stops, "algorithm": "qaoa"}
+        with self.client.post("/route/optimize", json=body, catch_response=True) as response:
+            result = response.json()
+            if response.status_code != 200 or len(result.get("path", [])) < 2:
+                response.failure(f"Bad qaoa result: HTTP {response.status_code}")